@@ -14,6 +14,8 @@ class BaseBall(ABC):
     Overview:
         Base class of all balls
     '''
+    TYPE_ID = -1 # Integer id of the ball type, used to dispatch collisions without isinstance checks
+
     @staticmethod
     def default_config():
         '''
@@ -24,6 +24,8 @@ class CloneBall(BaseBall):
         * Skill 2: Spit spores forward
         * There is a percentage of weight attenuation, and the radius will shrink as the weight attenuates
     """
+    TYPE_ID = 0
+
     @staticmethod
     def default_config():
 
@@ -11,6 +11,8 @@ class FoodBall(BaseBall):
         - characteristic:
         * Can't move, can only be eaten, randomly generated
     """
+    TYPE_ID = 3
+
     @staticmethod
     def default_config():
         cfg = BaseBall.default_config()
@@ -17,6 +17,8 @@ class SporeBall(BaseBall):
         * Can be eaten by CloneBall and ThornsBall
         * There is an initial velocity at birth, and it decays to 0 within a period of time
     """
+    TYPE_ID = 2
+
     @staticmethod
     def default_config():
         cfg = BaseBall.default_config()
@@ -16,6 +16,8 @@ class ThornsBall(BaseBall):
         * Can only be eaten by balls heavier than him. After eating, it will split the host into multiple smaller units.
         * Nothing happens when a ball lighter than him passes by
     """
+    TYPE_ID = 1
+
     @staticmethod
     def default_config():
         cfg = BaseBall.default_config()
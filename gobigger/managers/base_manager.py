@@ -1,5 +1,6 @@
 import math
 import logging
+import itertools
 from abc import ABC, abstractmethod
 from easydict import EasyDict
 from pygame.math import Vector2
@@ -13,18 +14,32 @@ class BaseManager(ABC):
     Overview:
         Base class for all ball managers
     '''
+    # Shared by all managers so that ball names stay unique across ball types
+    _name_counter = itertools.count(1)
+
     def __init__(self, cfg, border):
         self.cfg = cfg
         self.border = border
         self.balls = {}
+        self._balls_list_cache = None # list of balls, rebuilt lazily after balls change
         self.ball_settings = self.cfg.ball_settings
 
+    def _next_name(self):
+        '''
+        Overview:
+            Get a new unique name for a spawned ball
+        '''
+        return next(BaseManager._name_counter)
+
     def get_balls(self):
         '''
         Overview:
-            Get all balls currently managed
+            Get all balls currently managed. The returned list is cached until balls are added or removed, 
+            so callers should not modify it
         '''
-        return self.balls.values()
+        if self._balls_list_cache is None:
+            self._balls_list_cache = list(self.balls.values())
+        return self._balls_list_cache
     
     def add_balls(self, balls):
         '''
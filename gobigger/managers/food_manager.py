@@ -1,13 +1,12 @@
 import math
 import logging
-import random
-import uuid
+import numpy as np
 from abc import ABC, abstractmethod
 from easydict import EasyDict
 from pygame.math import Vector2
 
 from .base_manager import BaseManager
-from gobigger.utils import format_vector, Border
+from gobigger.utils import format_vector, Border, solve_cover
 from gobigger.balls import FoodBall, ThornsBall, CloneBall, SporeBall
 
 
@@ -17,42 +16,169 @@ class FoodManager(BaseManager):
         super(FoodManager, self).__init__(cfg, border)
         self.food_refresh_time = self.cfg.refresh_time
         self.refresh_time_count = 0
+        # Food balls never move, so they are hashed into a grid once to find the ones near a moving ball quickly
+        self.grid_size = 20
+        self.grid_shape = (max(1, int(math.ceil(self.border.width / self.grid_size))), 
+                           max(1, int(math.ceil(self.border.height / self.grid_size))))
+        self.reset_slots()
+
+    def reset_slots(self):
+        '''
+        Overview:
+            Food balls are also stored column-wise in slots, in the same order as self.balls. 
+            Removed balls leave a dead slot behind, and the slots are compacted once most of them are dead
+        '''
+        self._slots_balls = [] # ball in each slot, None if it has been removed
+        self._slots_array = np.zeros((0, 3), dtype=float) # x, y and radius of each slot, with spare capacity at the end
+        self._slots_cell = np.zeros(0, dtype=int) # grid cell of each slot
+        self._slots_alive = np.zeros(0, dtype=bool)
+        self._slots_index = {} # ball name -> slot
+        self._slots_num = 0
+
+    def get_grid_index(self, x, y):
+        '''
+        Overview:
+            Get the grid cell coordinates of the given position. x and y can be numbers or numpy arrays
+        '''
+        grid_x = np.clip((np.asarray(x) - self.border.minx) // self.grid_size, 0, self.grid_shape[0] - 1).astype(int)
+        grid_y = np.clip((np.asarray(y) - self.border.miny) // self.grid_size, 0, self.grid_shape[1] - 1).astype(int)
+        return grid_x, grid_y
+
+    def _add_slots(self, balls):
+        num = len(balls)
+        if num == 0:
+            return
+        start, end = self._slots_num, self._slots_num + num
+        if end > len(self._slots_array):
+            capacity = max(end, 2 * len(self._slots_array), 64)
+            for attr, dtype in (('_slots_array', float), ('_slots_cell', int), ('_slots_alive', bool)):
+                old = getattr(self, attr)
+                new = np.zeros((capacity,) + old.shape[1:], dtype=dtype)
+                new[:start] = old[:start]
+                setattr(self, attr, new)
+        balls_array = np.array([(ball.position.x, ball.position.y, ball.radius) for ball in balls], dtype=float)
+        grid_x, grid_y = self.get_grid_index(balls_array[:, 0], balls_array[:, 1])
+        self._slots_array[start:end] = balls_array
+        self._slots_cell[start:end] = grid_x * self.grid_shape[1] + grid_y
+        self._slots_alive[start:end] = True
+        for slot, ball in enumerate(balls, start):
+            self._slots_index[ball.name] = slot
+        self._slots_balls.extend(balls)
+        self._slots_num = end
+
+    def _remove_slot(self, ball):
+        slot = self._slots_index.pop(ball.name)
+        self._slots_balls[slot] = None
+        self._slots_alive[slot] = False
+        if self._slots_num - len(self._slots_index) > max(len(self._slots_index), 64):
+            self._compact_slots()
+
+    def _compact_slots(self):
+        alive = self._slots_alive[:self._slots_num]
+        num = int(alive.sum())
+        self._slots_array[:num] = self._slots_array[:self._slots_num][alive]
+        self._slots_cell[:num] = self._slots_cell[:self._slots_num][alive]
+        self._slots_alive[:num] = True
+        self._slots_alive[num:] = False
+        self._slots_balls = [ball for ball in self._slots_balls if ball is not None]
+        self._slots_index = {ball.name: slot for slot, ball in enumerate(self._slots_balls)}
+        self._slots_num = num
+
+    def _query_nearby_slots(self, query_list):
+        # Slots of the alive balls in the grid cells near any ball in query_list, the only ones that may collide with them
+        if len(self.balls) == 0:
+            return np.zeros(0, dtype=int)
+        alive = self._slots_alive[:self._slots_num]
+        radius_max = self._slots_array[:self._slots_num, 2][alive].max()
+        touched = np.zeros(self.grid_shape, dtype=bool)
+        for ball in query_list:
+            radius = max(ball.radius, radius_max)
+            (x0, x1), (y0, y1) = self.get_grid_index((ball.position.x - radius, ball.position.x + radius), 
+                                                     (ball.position.y - radius, ball.position.y + radius))
+            touched[x0:x1+1, y0:y1+1] = True
+        return np.flatnonzero(touched.ravel()[self._slots_cell[:self._slots_num]] & alive)
+
+    def solve_collisions(self, query_list):
+        '''
+        Overview:
+            Find the food balls that collide with each ball in query_list
+        Parameters:
+            query_list <List[BaseBall]>: List of balls that need to be queried for collision
+        Returns:
+            results <Dict[int: List[FoodBall]> same format as the results of collision detection, 
+                only the queries with collisions are included
+        '''
+        results = {}
+        if len(query_list) == 0:
+            return results
+        nearby_slots = self._query_nearby_slots(query_list)
+        if len(nearby_slots) == 0:
+            return results
+        slots_balls = self._slots_balls
+        query = np.array([(ball.position.x, ball.position.y, ball.radius) for ball in query_list], dtype=float)
+        for i, indices in enumerate(solve_cover(query, self._slots_array[nearby_slots])):
+            if len(indices) > 0:
+                results[i] = [slots_balls[j] for j in nearby_slots[indices].tolist()]
+        return results
 
-    def get_balls(self):
-        return list(self.balls.values())
-    
     def add_balls(self, balls):
+        if isinstance(balls, FoodBall):
+            balls = [balls]
         if isinstance(balls, list):
+            new_balls = []
             for ball in balls:
+                if ball.name in self._slots_index:
+                    # A ball with a known name replaces the old one in place, as it does in self.balls
+                    slot = self._slots_index[ball.name]
+                    self._slots_balls[slot] = ball
+                    self._slots_array[slot] = (ball.position.x, ball.position.y, ball.radius)
+                    grid_x, grid_y = self.get_grid_index(ball.position.x, ball.position.y)
+                    self._slots_cell[slot] = grid_x * self.grid_shape[1] + grid_y
+                else:
+                    new_balls.append(ball)
                 self.balls[ball.name] = ball
-        elif isinstance(balls, FoodBall):
-            self.balls[balls.name] = balls
+            self._add_slots(new_balls)
+        self._balls_list_cache = None
         return True
 
     def refresh(self):
         todo_num = min(self.cfg.refresh_num, self.cfg.num_max - len(self.balls))
-        for _ in range(todo_num):
-            self.add_balls(self.spawn_ball())
+        self.add_balls(self.spawn_balls_batch(todo_num))
 
     def remove_balls(self, balls):
         if isinstance(balls, list):
             for ball in balls:
                 ball.remove()
                 del self.balls[ball.name]
+                self._remove_slot(ball)
         elif isinstance(balls, FoodBall):
             balls.remove()
             del self.balls[balls.name]
+            self._remove_slot(balls)
+        self._balls_list_cache = None
 
     def spawn_ball(self):
-        position = self.border.sample()
-        size = random.uniform(self.ball_settings.radius_min, self.ball_settings.radius_max)**2
-        name = uuid.uuid1()
-        return FoodBall(name=name, position=position, border=self.border, size=size, **self.ball_settings)
+        return self.spawn_balls_batch(1)[0]
+
+    def spawn_balls_batch(self, num):
+        '''
+        Overview:
+            Spawn several food balls at once. Positions and sizes are sampled in bulk by numpy
+        Parameters:
+            num <int>: number of balls to spawn
+        Returns:
+            balls <List[FoodBall]>: new balls
+        '''
+        if num <= 0:
+            return []
+        positions = np.random.uniform([self.border.minx, self.border.miny], 
+                                      [self.border.maxx, self.border.maxy], size=(num, 2))
+        sizes = np.random.uniform(self.ball_settings.radius_min, self.ball_settings.radius_max, size=num)**2
+        return [FoodBall(name=self._next_name(), position=Vector2(x, y), border=self.border, size=size, **self.ball_settings) 
+                for (x, y), size in zip(positions.tolist(), sizes.tolist())]
 
     def init_balls(self):
-        for _ in range(self.cfg.num_init):
-            ball = self.spawn_ball()
-            self.balls[ball.name] = ball
+        self.add_balls(self.spawn_balls_batch(self.cfg.num_init))
 
     def step(self, duration):
         self.refresh_time_count += duration
@@ -63,4 +189,6 @@ class FoodManager(BaseManager):
     def reset(self):
         self.refresh_time_count = 0
         self.balls = {}
+        self._balls_list_cache = None
+        self.reset_slots()
         return True
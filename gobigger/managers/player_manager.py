@@ -21,6 +21,8 @@ class PlayerManager(BaseManager):
         self.player_num = self.team_num * self.player_num_per_team
         self.spore_manager_settings = spore_manager_settings
         self.spore_settings = self.spore_manager_settings.ball_settings
+        self._teams_size_cache = None # team sizes, recomputed lazily after sizes may have changed
+        self._teams_size_sorted_cache = None
 
     def init_balls(self):
         for i in range(self.team_num):
@@ -30,6 +32,7 @@ class PlayerManager(BaseManager):
                 player = HumanPlayer(cfg=self.cfg.ball_settings, team_name=team_name, name=player_name, border=self.border, spore_settings=self.spore_settings)
                 player.respawn(position=self.border.sample())
                 self.players[player_name] = player
+        self._clear_teams_size_cache()
             
     def get_balls(self):
         balls = []
@@ -50,6 +53,7 @@ class PlayerManager(BaseManager):
                 self.players[ball.owner].add_balls(ball)
         elif isinstance(balls, CloneBall):
             self.players[balls.owner].add_balls(balls)
+        self._clear_teams_size_cache()
         return True
 
     def remove_balls(self, balls):
@@ -58,11 +62,13 @@ class PlayerManager(BaseManager):
                 self.players[ball.owner].remove_balls(ball)
         elif isinstance(balls, CloneBall):
             self.players[balls.owner].remove_balls(balls)
+        self._clear_teams_size_cache()
 
     def step(self):
         for player_name, player in self.players.items():
             if player.get_clone_num() == 0:
                 player.respawn(position=self.border.sample())
+        self._clear_teams_size_cache()
 
     def adjust(self):
         '''
@@ -71,6 +77,7 @@ class PlayerManager(BaseManager):
         '''
         for player in self.get_players():
             player.adjust()
+        self._clear_teams_size_cache()
         return True
 
     def get_clone_num(self, ball):
@@ -107,14 +114,34 @@ class PlayerManager(BaseManager):
             ret[player.team_name].append(player.name)
         return list(ret.values())
 
+    def _clear_teams_size_cache(self):
+        self._teams_size_cache = None
+        self._teams_size_sorted_cache = None
+
     def get_teams_size(self):
-        team_name_size = {}
-        for player in self.get_players():
-            if player.team_name not in team_name_size:
-                team_name_size[player.team_name] = player.get_total_size()
-            else:
-                team_name_size[player.team_name] += player.get_total_size()
-        return team_name_size
+        '''
+        Overview:
+            get the total size of each team. The result is cached until the next tick (or until balls are added or removed), 
+            so it should not be modified
+        '''
+        if self._teams_size_cache is None:
+            team_name_size = {}
+            for player in self.get_players():
+                if player.team_name not in team_name_size:
+                    team_name_size[player.team_name] = player.get_total_size()
+                else:
+                    team_name_size[player.team_name] += player.get_total_size()
+            self._teams_size_cache = team_name_size
+        return self._teams_size_cache
+
+    def get_teams_size_sorted(self):
+        '''
+        Overview:
+            get (team_name, size) pairs of all teams sorted by size from largest to smallest
+        '''
+        if self._teams_size_sorted_cache is None:
+            self._teams_size_sorted_cache = tuple(sorted(self.get_teams_size().items(), key=lambda d: d[1], reverse=True))
+        return self._teams_size_sorted_cache
 
     def reset(self):
         '''
@@ -123,4 +150,5 @@ class PlayerManager(BaseManager):
         '''
         self.refresh_time_count = 0
         self.players = {}
+        self._clear_teams_size_cache()
         return True
@@ -15,16 +15,19 @@ class SporeManager(BaseManager):
 
     def __init__(self, cfg, border):
         super(SporeManager, self).__init__(cfg, border)
+        self._moving = {} # name -> spore ball that is still moving after being ejected
 
-    def get_balls(self):
-        return list(self.balls.values())
-    
     def add_balls(self, balls):
         if isinstance(balls, list):
             for ball in balls:
                 self.balls[ball.name] = ball
+                if ball.moving:
+                    self._moving[ball.name] = ball
         elif isinstance(balls, SporeBall):
             self.balls[balls.name] = balls
+            if balls.moving:
+                self._moving[balls.name] = balls
+        self._balls_list_cache = None
         return True
 
     def remove_balls(self, balls):
@@ -32,13 +35,28 @@ class SporeManager(BaseManager):
             for ball in balls:
                 ball.remove()
                 del self.balls[ball.name]
+                self._moving.pop(ball.name, None)
         elif isinstance(balls, SporeBall):
             balls.remove()
             del self.balls[balls.name]
+            self._moving.pop(balls.name, None)
+        self._balls_list_cache = None
+
+    def move_balls(self, duration):
+        '''
+        Overview:
+            Move the spore balls that are still moving, and forget the ones that have stopped
+        '''
+        for ball in list(self._moving.values()):
+            ball.move(duration=duration)
+            if not ball.moving:
+                del self._moving[ball.name]
 
     def step(self, duration):
         return
 
     def reset(self):
         self.balls = {}
+        self._balls_list_cache = None
+        self._moving = {}
         return True
@@ -1,9 +1,11 @@
 import logging
 import pytest
 import uuid
+import random
 from pygame.math import Vector2
 
 from gobigger.managers import FoodManager
+from gobigger.balls import FoodBall
 from gobigger.utils import Border
 from gobigger.server import Server
 
@@ -31,6 +33,47 @@ class TestFoodManager:
             logging.debug(balls[i])
         assert True
 
+    def test_get_balls_cache(self):
+        food_manager = self.get_manager()
+        food_manager.init_balls()
+        balls = food_manager.get_balls()
+        assert food_manager.get_balls() is balls
+        food_manager.remove_balls(balls[0])
+        assert len(food_manager.get_balls()) == len(balls) - 1
+        food_manager.add_balls(balls[0])
+        assert len(food_manager.get_balls()) == len(balls)
+
+    def test_spawn_balls_batch(self):
+        food_manager = self.get_manager()
+        balls = food_manager.spawn_balls_batch(100)
+        assert len(balls) == 100
+        for ball in balls:
+            assert food_manager.border.contains(ball.position)
+        assert food_manager.spawn_balls_batch(0) == []
+        assert isinstance(food_manager.spawn_ball(), FoodBall)
+
+    def test_solve_collisions_exhaustive(self):
+        food_manager = self.get_manager()
+        food_manager.init_balls()
+        balls = food_manager.get_balls()
+        border = food_manager.border
+        query_list = [FoodBall('query', border.sample(), border=border, size=random.uniform(5, 100)**2) for _ in range(50)]
+        query_list.append(FoodBall('query', Vector2(border.minx, border.miny), border=border, size=100))
+        results = food_manager.solve_collisions(query_list)
+        for i, query in enumerate(query_list):
+            assert results.get(i, []) == [ball for ball in balls if query.judge_cover(ball)]
+
+    def test_solve_collisions(self):
+        food_manager = self.get_manager()
+        food_manager.init_balls()
+        balls = food_manager.get_balls()
+        query_list = [FoodBall('query', Vector2(balls[0].position), border=food_manager.border, size=100)]
+        results = food_manager.solve_collisions(query_list)
+        assert balls[0] in results[0]
+        for ball in results[0]:
+            assert query_list[0].judge_cover(ball)
+        assert food_manager.solve_collisions([]) == {}
+
     def test_remove_balls(self):
         food_manager = self.get_manager()
         food_manager.init_balls()
@@ -41,6 +84,21 @@ class TestFoodManager:
             .format(food_manager.cfg.num_init, len(food_manager.get_balls())))
         assert True
 
+    def test_solve_collisions_after_remove(self):
+        food_manager = self.get_manager()
+        food_manager.init_balls()
+        balls = food_manager.get_balls()
+        removed = balls[::3] + balls[1::3]
+        food_manager.remove_balls(removed) # most balls are removed, so the slots are compacted
+        food_manager.remove_balls(food_manager.get_balls()[0])
+        food_manager.refresh()
+        balls = food_manager.get_balls()
+        query_list = [FoodBall('query', Vector2(ball.position), border=food_manager.border, size=100) 
+                      for ball in removed[::10] + balls[::10]]
+        results = food_manager.solve_collisions(query_list)
+        for i, query in enumerate(query_list):
+            assert results.get(i, []) == [ball for ball in balls if query.judge_cover(ball)]
+
     def test_step(self):
         food_manager = self.get_manager()
         food_manager.init_balls()
@@ -126,6 +126,21 @@ class TestPlayerManager:
         assert len(player_names_with_team) == cfg.team_num
         assert len(player_names_with_team[0]) == cfg.player_num_per_team
 
+    def test_get_teams_size_sorted(self):
+        cfg = Server.default_config()
+        player_manager = self.get_manager()
+        player_manager.init_balls()
+        teams_size = player_manager.get_teams_size_sorted()
+        assert len(teams_size) == cfg.team_num
+        assert teams_size is player_manager.get_teams_size_sorted()
+        player = player_manager.get_players()[0]
+        ball = player.get_balls()[0]
+        ball.set_size(ball.size * 4)
+        player_manager.step()
+        teams_size = player_manager.get_teams_size_sorted()
+        assert teams_size[0][0] == player.team_name
+        assert teams_size[0][1] >= teams_size[-1][1]
+
     def test_reset(self):
         cfg = Server.default_config()
         border = Border(0, 0, cfg.map_width, cfg.map_height)
@@ -51,6 +51,26 @@ class TestSporeManager:
             .format(original_len, len(spore_manager.get_balls())))
         assert True
 
+    def test_move_balls(self):
+        spore_manager = self.get_manager()
+        for i in range(10):
+            spore_manager.add_balls(self.get_spore_ball())
+        balls = spore_manager.get_balls()
+        removed_ball = balls[0]
+        spore_manager.remove_balls(removed_ball)
+        removed_position = Vector2(removed_ball.position)
+        spore_ball = spore_manager.get_balls()[0]
+        assert spore_ball.moving
+        position = Vector2(spore_ball.position)
+        spore_manager.move_balls(duration=0.05)
+        assert spore_ball.position != position
+        assert removed_ball.position == removed_position # removed balls are not moved
+        while spore_ball.moving:
+            spore_manager.move_balls(duration=0.05)
+        position = Vector2(spore_ball.position)
+        spore_manager.move_balls(duration=0.05)
+        assert spore_ball.position == position
+
     def test_reset(self):
         spore_manager = self.get_manager()
         for i in range(10):
@@ -4,6 +4,7 @@ import uuid
 from pygame.math import Vector2
 
 from gobigger.managers import ThornsManager
+from gobigger.balls import SporeBall
 from gobigger.utils import Border
 from gobigger.server import Server
 
@@ -31,6 +32,23 @@ class TestThornsManager:
             logging.debug(balls[i])
         assert True
 
+    def test_eat_spore(self):
+        thorns_manager = self.get_manager()
+        thorns_manager.init_balls()
+        thorns_ball = thorns_manager.get_balls()[0]
+        spore_ball = SporeBall('spore', Vector2(thorns_ball.position), border=thorns_manager.border, 
+                               size=SporeBall.default_config().spore_radius_init ** 2, direction=Vector2(1, 0))
+        thorns_manager.eat_spore(thorns_ball, spore_ball)
+        assert thorns_ball.moving
+        position = Vector2(thorns_ball.position)
+        thorns_manager.move_balls(duration=0.05)
+        assert thorns_ball.position != position
+        while thorns_ball.moving:
+            thorns_manager.move_balls(duration=0.05)
+        position = Vector2(thorns_ball.position)
+        thorns_manager.move_balls(duration=0.05)
+        assert thorns_ball.position == position
+
     def test_remove_balls(self):
         thorns_manager = self.get_manager()
         thorns_manager.init_balls()
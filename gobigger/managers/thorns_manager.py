@@ -1,7 +1,6 @@
 import math
 import logging
 import random
-import uuid
 from abc import ABC, abstractmethod
 from easydict import EasyDict
 from pygame.math import Vector2
@@ -17,16 +16,19 @@ class ThornsManager(BaseManager):
         super(ThornsManager, self).__init__(cfg, border)
         self.thorns_refresh_time = self.cfg.refresh_time
         self.refresh_time_count = 0
+        self._moving = {} # name -> thorns ball that is still moving after eating a spore
 
-    def get_balls(self):
-        return list(self.balls.values())
-    
     def add_balls(self, balls):
         if isinstance(balls, list):
             for ball in balls:
                 self.balls[ball.name] = ball
+                if ball.moving:
+                    self._moving[ball.name] = ball
         elif isinstance(balls, ThornsBall):
             self.balls[balls.name] = balls
+            if balls.moving:
+                self._moving[balls.name] = balls
+        self._balls_list_cache = None
         return True
 
     def refresh(self):
@@ -39,20 +41,43 @@ class ThornsManager(BaseManager):
             for ball in balls:
                 ball.remove()
                 del self.balls[ball.name]
+                self._moving.pop(ball.name, None)
         elif isinstance(balls, ThornsBall):
             balls.remove()
             del self.balls[balls.name]
+            self._moving.pop(balls.name, None)
+        self._balls_list_cache = None
+
+    def eat_spore(self, thorns_ball, spore_ball):
+        '''
+        Overview:
+            Let a thorns ball eat a spore ball, which pushes the thorns ball along the spore's direction
+        '''
+        thorns_ball.eat(spore_ball)
+        if thorns_ball.moving:
+            self._moving[thorns_ball.name] = thorns_ball
+
+    def move_balls(self, duration):
+        '''
+        Overview:
+            Move the thorns balls that are still moving, and forget the ones that have stopped
+        '''
+        for ball in list(self._moving.values()):
+            ball.move(duration=duration)
+            if not ball.moving:
+                del self._moving[ball.name]
 
     def spawn_ball(self):
         position = self.border.sample()
         size = random.uniform(self.ball_settings.radius_min, self.ball_settings.radius_max)**2
-        name = uuid.uuid1()
+        name = self._next_name()
         return ThornsBall(name=name, position=position, border=self.border, size=size, **self.ball_settings)
 
     def init_balls(self):
         for _ in range(self.cfg.num_init):
             ball = self.spawn_ball()
             self.balls[ball.name] = ball
+        self._balls_list_cache = None
 
     def step(self, duration):
         self.refresh_time_count += duration
@@ -63,4 +88,6 @@ class ThornsManager(BaseManager):
     def reset(self):
         self.refresh_time_count = 0
         self.balls = {}
+        self._balls_list_cache = None
+        self._moving = {}
         return True
@@ -1,4 +1,5 @@
 import uuid
+from operator import attrgetter
 from pygame.math import Vector2
 import logging
 
@@ -194,7 +195,7 @@ class HumanPlayer(BasePlayer):
             2. Possible ball-ball fusion
         '''
         balls = self.get_balls()
-        balls = sorted(balls, reverse=True)
+        balls.sort(key=attrgetter('size'), reverse=True)
         balls_num = len(balls)
         to_remove_balls = []
         for i in range(balls_num-1):
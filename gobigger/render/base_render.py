@@ -19,10 +19,83 @@ class BaseRender:
         self.background = background
         self.FPS = 60 # Set the frame rate (the number of screen refreshes per second)
         self.fpsClock = pygame.time.Clock() 
+        self._circle_sprites = {} # (color, radius) -> surface with the circle drawn on it
+        self._static_blit_sequences = {} # color -> (balls, blit sequence, ball name -> blit item) of the last static balls drawn
+        self._background_surface = None # background with the grid, built on first use
         if not only_render:
             self.screen = pygame.display.set_mode((self.width_full, self.height_full),  0, 32)
             pygame.display.set_caption("GoBigger - Opendilab Challenge")
 
+    def get_background(self):
+        '''
+        Overview:
+            Get the background surface with the grid drawn on it. It never changes, so it is only drawn once
+        '''
+        if self._background_surface is None:
+            self._background_surface = pygame.Surface((self.width_full, self.height_full))
+            self._background_surface.fill(self.background)
+            for x in range(0, self.width, self.cell_size):
+                pygame.draw.line(self._background_surface, GRAY, (x, 0), (x, self.height))
+            for y in range(0, self.height, self.cell_size):
+                pygame.draw.line(self._background_surface, GRAY, (0, y), (self.width, y))
+        return self._background_surface
+
+    def get_circle_sprite(self, color, radius):
+        '''
+        Overview:
+            Get the cached surface of a circle with the given color and integer radius
+        '''
+        key = (color, radius)
+        if key not in self._circle_sprites:
+            colorkey = tuple(255 - c for c in color) # any color that differs from the circle
+            sprite = pygame.Surface((radius * 2, radius * 2))
+            sprite.fill(colorkey)
+            sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            self._circle_sprites[key] = sprite
+        return self._circle_sprites[key]
+
+    def get_blit_item(self, ball, color):
+        '''
+        Overview:
+            Get the (sprite, position) pair that draws the ball, or None if it is too small to be drawn
+        '''
+        radius = int(ball.radius)
+        if radius <= 0:
+            return None
+        # draw.circle truncates the center, so the sprite is placed from the truncated center as well
+        x, y = ball.position
+        return (self.get_circle_sprite(color, radius), (int(x) - radius, int(y) - radius))
+
+    def draw_balls(self, screen, balls, color, static=False):
+        '''
+        Overview:
+            Draw balls of the same color with one batched blit of cached circle sprites. 
+            The result is the same as calling pygame.draw.circle on each ball
+        Parameters:
+            static <bool>: the balls never move, so the blit sequence is reused as long as the same list is passed in, 
+                and the blit item of each ball is kept by name so that only new balls are computed when the list changes
+        '''
+        if not static:
+            blit_sequence = [self.get_blit_item(ball, color) for ball in balls]
+            screen.blits([item for item in blit_sequence if item is not None], doreturn=False)
+            return
+        last_balls, blit_sequence, blit_items = self._static_blit_sequences.get(color, (None, None, {}))
+        if last_balls is not balls:
+            if len(blit_items) > 2 * len(balls):
+                # drop the items of balls that are gone
+                blit_items = {ball.name: blit_items[ball.name] for ball in balls if ball.name in blit_items}
+            get_item = blit_items.get
+            blit_sequence = []
+            for ball in balls:
+                item = get_item(ball.name, False)
+                if item is False:
+                    item = blit_items[ball.name] = self.get_blit_item(ball, color)
+                if item is not None:
+                    blit_sequence.append(item)
+            self._static_blit_sequences[color] = (balls, blit_sequence, blit_items)
+        screen.blits(blit_sequence, doreturn=False)
+
     def fill(self, server):
         raise NotImplementedError
 
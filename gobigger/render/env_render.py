@@ -9,8 +9,8 @@ import cv2
 import time
 
 from .base_render import BaseRender
-from gobigger.utils import Colors, BLACK, YELLOW, GREEN
-from gobigger.utils import PLAYER_COLORS, FOOD_COLOR, THORNS_COLOR, SPORE_COLOR
+from gobigger.utils import Colors_np, BLACK, YELLOW, GREEN
+from gobigger.utils import PLAYER_COLORS, PLAYER_COLORS_np, FOOD_COLOR, THORNS_COLOR, SPORE_COLOR
 from gobigger.utils import precision_algorithm, Border
 
 class EnvRender(BaseRender):
@@ -28,17 +28,14 @@ class EnvRender(BaseRender):
         self.use_spatial = use_spatial
 
     def fill_all(self, screen, food_balls, thorns_balls, spore_balls, players, ):
-        font = pygame.font.SysFont('Menlo', 12, True)
         # render all balls
-        for ball in food_balls:
-            pygame.draw.circle(screen, FOOD_COLOR, ball.position, ball.radius)
-        for ball in thorns_balls:
-            pygame.draw.circle(screen, THORNS_COLOR, ball.position, ball.radius)
-        for ball in spore_balls:
-            pygame.draw.circle(screen, SPORE_COLOR, ball.position, ball.radius)
-        for index, player in enumerate(players):
+        self.draw_balls(screen, food_balls, FOOD_COLOR, static=True)
+        self.draw_balls(screen, thorns_balls, THORNS_COLOR)
+        self.draw_balls(screen, spore_balls, SPORE_COLOR)
+        colors = PLAYER_COLORS_np[[int(player.name) for player in players]].tolist()
+        for player, color in zip(players, colors):
             for ball in player.get_balls():
-                pygame.draw.circle(screen, PLAYER_COLORS[int(ball.owner)], ball.position, ball.radius)
+                pygame.draw.circle(screen, color, ball.position, ball.radius)
         screen_data = pygame.surfarray.array3d(screen)
         return screen_data
 
@@ -135,17 +132,14 @@ class EnvRender(BaseRender):
     def get_tick_all_colorful(self, food_balls, thorns_balls, spore_balls, players, partial_size=300):
         screen_all = pygame.Surface((self.width, self.height))
         screen_all.fill(self.background)
-        font = pygame.font.SysFont('Menlo', 12, True)
         # render all balls
-        for ball in food_balls:
-            pygame.draw.circle(screen_all, BLACK, ball.position, ball.radius)
-        for ball in thorns_balls:
-            pygame.draw.circle(screen_all, GREEN, ball.position, ball.radius)
-        for ball in spore_balls:
-            pygame.draw.circle(screen_all, YELLOW, ball.position, ball.radius)
-        for index, player in enumerate(players):
+        self.draw_balls(screen_all, food_balls, BLACK, static=True)
+        self.draw_balls(screen_all, thorns_balls, GREEN)
+        self.draw_balls(screen_all, spore_balls, YELLOW)
+        colors = Colors_np[[int(player.name) for player in players]].tolist()
+        for player, color in zip(players, colors):
             for ball in player.get_balls():
-                pygame.draw.circle(screen_all, Colors[int(ball.owner)], ball.position, ball.radius)
+                pygame.draw.circle(screen_all, color, ball.position, ball.radius)
         screen_data_all = pygame.surfarray.array3d(screen_all)
         screen_data_players = {}
         for player in players:
@@ -5,10 +5,22 @@ from pygame.math import Vector2
 import pygame
 import random
 import cv2
+import functools
 
 from .base_render import BaseRender
 from .env_render import EnvRender
-from gobigger.utils import Colors, GRAY, BLACK, RED, YELLOW, GREEN
+from gobigger.utils import Colors_np, GRAY, BLACK, RED, YELLOW, GREEN
+
+
+def text_renderer(font, color, maxsize=256):
+    '''
+    Overview:
+        Wrap font.render with a LRU cache, so that the same text is only rasterized once
+    '''
+    @functools.lru_cache(maxsize=maxsize)
+    def render_text(text):
+        return font.render(text, 1, color)
+    return render_text
 
 
 class RealtimeRender(EnvRender):
@@ -19,47 +31,40 @@ class RealtimeRender(EnvRender):
     def __init__(self, width, height, background=(255,255,255), padding=(0,0), cell_size=10, only_render=False):
         super(RealtimeRender, self).__init__(width, height, background=background, padding=padding, 
                                              cell_size=cell_size, only_render=only_render)
+        self.font = pygame.font.SysFont('Menlo', 15, True)
+        self.render_text = text_renderer(self.font, RED)
 
     def fill(self, server, direction=None, fps=0, last_time=0):
-        self.screen.fill(self.background)
+        screen = self.screen
+        render_text = self.render_text
+        player_manager = server.player_manager
+        foods = server.food_manager.get_balls()
+        thorns = server.thorns_manager.get_balls()
+        spores = server.spore_manager.get_balls()
+        players = player_manager.get_players()
 
-        for x in range(0, self.width, self.cell_size):
-            pygame.draw.line(self.screen, GRAY, (x, 0), (x, self.height))
-        for y in range(0, self.height, self.cell_size):
-            pygame.draw.line(self.screen, GRAY, (0, y), (self.width, y))
+        screen.blit(self.get_background(), (0, 0))
 
-        font = pygame.font.SysFont('Menlo', 12, True)
         # Render all balls
-        for ball in server.food_manager.get_balls():
-            pygame.draw.circle(self.screen, BLACK, ball.position, ball.radius)
-        for ball in server.thorns_manager.get_balls():
-            pygame.draw.circle(self.screen, GREEN, ball.position, ball.radius)
-        for ball in server.spore_manager.get_balls():
-            pygame.draw.circle(self.screen, YELLOW, ball.position, ball.radius)
-        for index, player in enumerate(server.player_manager.get_players()):
+        self.draw_balls(screen, foods, BLACK, static=True)
+        self.draw_balls(screen, thorns, GREEN)
+        self.draw_balls(screen, spores, YELLOW)
+        # All balls of a player share its color, which is indexed by the player name
+        colors = Colors_np[[int(player.name) for player in players]].tolist()
+        for player, color in zip(players, colors):
             for ball in player.get_balls():
-                pygame.draw.circle(self.screen, Colors[int(ball.owner)], ball.position, ball.radius)
+                pygame.draw.circle(screen, color, ball.position, ball.radius)
 
         # for debug
-        font= pygame.font.SysFont('Menlo', 15, True)
-
-        team_name_size = {}
-        for player in server.player_manager.get_players():
-            if player.team_name not in team_name_size:
-                team_name_size[player.team_name] = player.get_total_size()
-            else:
-                team_name_size[player.team_name] += player.get_total_size()
-        team_name_size = sorted(team_name_size.items(), key=lambda d: d[1], reverse=True)
+        team_name_size = player_manager.get_teams_size_sorted()
         for index, (team_name, team_size) in enumerate(team_name_size):
-            pos_txt= font.render('{}: {:.5f}'.format(team_name, team_size), 1, RED)
-            self.screen.blit(pos_txt, (20, 10+10*(index*2+1)))
+            pos_txt = render_text('{}: {:.5f}'.format(team_name, team_size))
+            screen.blit(pos_txt, (20, 10+10*(index*2+1)))
 
-        fps_txt = font.render(
-            'fps: ' + str(fps), 1, RED)
-        last_time_txt = font.render(
-            'last_time: ' + str(last_time), 1, RED)
-        self.screen.blit(fps_txt, (20, self.height_full - 30))
-        self.screen.blit(last_time_txt, (20, self.height_full - 50))
+        fps_txt = render_text('fps: ' + str(fps))
+        last_time_txt = render_text('last_time: ' + str(last_time))
+        screen.blit(fps_txt, (20, self.height_full - 30))
+        screen.blit(last_time_txt, (20, self.height_full - 50))
 
     
     def show(self):
@@ -82,54 +87,52 @@ class RealtimePartialRender(EnvRender):
                                                     vision_x_min=vision_x_min, vision_y_min=vision_y_min,
                                                     only_render=only_render)
         self.player_name = player_name
+        # Surfaces reused by every fill: the whole map, and the player's view scaled up to the screen size
+        self.map_screen = pygame.Surface((self.width, self.height))
+        self.scaled_screen = pygame.Surface((self.width, self.height))
+        self.font = pygame.font.SysFont('Menlo', 15, True)
+        self.render_text = text_renderer(self.font, RED)
 
     def fill(self, server, direction=None, fps=0, last_time=0):
+        render_text = self.render_text
+        player_manager = server.player_manager
+        foods = server.food_manager.get_balls()
+        thorns = server.thorns_manager.get_balls()
+        spores = server.spore_manager.get_balls()
+        players = player_manager.get_players()
+
         if self.player_name is None:
-            player = server.player_manager.get_players()[0]
+            player = players[0]
         else:
-            player = server.player_manager.get_player_by_name(self.player_name)
+            player = player_manager.get_player_by_name(self.player_name)
         rectangle = self.get_rectangle_by_player(player)
 
-        screen = pygame.Surface((self.width, self.height))
-        screen.fill(self.background)
-        for x in range(0, self.width, self.cell_size):
-            pygame.draw.line(screen, GRAY, (x, 0), (x, self.height))
-        for y in range(0, self.height, self.cell_size):
-            pygame.draw.line(screen, GRAY, (0, y), (self.width, y))
-
-        font = pygame.font.SysFont('Menlo', 12, True)
-        for ball in server.food_manager.get_balls():
-            pygame.draw.circle(screen, BLACK, ball.position, ball.radius)
-        for ball in server.thorns_manager.get_balls():
-            pygame.draw.circle(screen, GREEN, ball.position, ball.radius)
-        for ball in server.spore_manager.get_balls():
-            pygame.draw.circle(screen, YELLOW, ball.position, ball.radius)
-        for index, player in enumerate(server.player_manager.get_players()):
+        screen = self.map_screen
+        screen.blit(self.get_background(), (0, 0))
+
+        self.draw_balls(screen, foods, BLACK, static=True)
+        self.draw_balls(screen, thorns, GREEN)
+        self.draw_balls(screen, spores, YELLOW)
+        # All balls of a player share its color, which is indexed by the player name
+        colors = Colors_np[[int(player.name) for player in players]].tolist()
+        for player, color in zip(players, colors):
             for ball in player.get_balls():
-                pygame.draw.circle(screen, Colors[int(ball.owner)], ball.position, ball.radius)
-        screen_data = pygame.surfarray.array3d(screen)
+                pygame.draw.circle(screen, color, ball.position, ball.radius)
 
-        screen_data = self.get_clip_screen(screen_data, rectangle)
-        player_surface = pygame.pixelcopy.make_surface(screen_data)
-        screen_data = pygame.transform.scale(player_surface, (self.width, self.height))
-        self.screen.blit(screen_data, (0, 0))
+        # The subsurface shares pixels with the map screen, so the view is scaled without copying it out first
+        clip_rect = pygame.Rect(rectangle[0], rectangle[1], rectangle[2] - rectangle[0], rectangle[3] - rectangle[1])
+        player_surface = screen.subsurface(clip_rect.clip(screen.get_rect()))
+        pygame.transform.scale(player_surface, (self.width, self.height), self.scaled_screen)
+        self.screen.blit(self.scaled_screen, (0, 0))
 
         # for debug
-        font= pygame.font.SysFont('Menlo', 15, True)
-
-        team_name_size = {}
-        for player in server.player_manager.get_players():
-            if player.team_name not in team_name_size:
-                team_name_size[player.team_name] = player.get_total_size()
-            else:
-                team_name_size[player.team_name] += player.get_total_size()
-        team_name_size = sorted(team_name_size.items(), key=lambda d: d[1], reverse=True)
+        team_name_size = player_manager.get_teams_size_sorted()
         for index, (team_name, team_size) in enumerate(team_name_size):
-            pos_txt= font.render('{}: {:.5f}'.format(team_name, team_size), 1, RED)
+            pos_txt = render_text('{}: {:.5f}'.format(team_name, team_size))
             self.screen.blit(pos_txt, (20, 10+10*(index*2+1)))
 
-        fps_txt = font.render('fps: ' + str(fps), 1, RED)
-        last_time_txt = font.render('last_time: ' + str(last_time), 1, RED)
+        fps_txt = render_text('fps: ' + str(fps))
+        last_time_txt = render_text('last_time: ' + str(last_time))
         self.screen.blit(fps_txt, (20, self.height_full - 30))
         self.screen.blit(last_time_txt, (20, self.height_full - 50))
     
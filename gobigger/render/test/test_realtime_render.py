@@ -26,4 +26,46 @@ class TestRealtimePartialRender:
         server = Server()
         server.start()
         render.fill(server)
-        render.close()
\ No newline at end of file
+        render.close()
+
+    def test_draw_balls(self):
+        render = RealtimePartialRender(width=1000, height=1000)
+        server = Server()
+        server.start()
+        balls = server.food_manager.get_balls() + server.thorns_manager.get_balls()
+        # balls crossing the edges of the screen, whose blit offsets are negative
+        border = Border(-100, -100, 1100, 1100)
+        for i in range(200):
+            position = Vector2(random.uniform(-20, 20), random.uniform(-20, 1020))
+            if i % 2:
+                position = Vector2(position.y, position.x)
+            balls.append(BaseBall(i, position=position, border=border, size=random.uniform(1, 30)**2))
+        screen_circle = pygame.Surface((1000, 1000))
+        screen_circle.fill(render.background)
+        for ball in balls:
+            pygame.draw.circle(screen_circle, (0, 0, 0), ball.position, ball.radius)
+        screen_sprite = pygame.Surface((1000, 1000))
+        screen_sprite.fill(render.background)
+        render.draw_balls(screen_sprite, balls, (0, 0, 0))
+        assert (pygame.surfarray.array3d(screen_circle) == pygame.surfarray.array3d(screen_sprite)).all()
+        render.close()
+
+    def test_draw_static_balls(self):
+        render = RealtimePartialRender(width=1000, height=1000)
+        server = Server()
+        server.start()
+        food_manager = server.food_manager
+        for i in range(3):
+            balls = food_manager.get_balls()
+            screen_circle = pygame.Surface((1000, 1000))
+            screen_circle.fill(render.background)
+            for ball in balls:
+                pygame.draw.circle(screen_circle, (0, 0, 0), ball.position, ball.radius)
+            screen_sprite = pygame.Surface((1000, 1000))
+            screen_sprite.fill(render.background)
+            render.draw_balls(screen_sprite, balls, (0, 0, 0), static=True)
+            assert (pygame.surfarray.array3d(screen_circle) == pygame.surfarray.array3d(screen_sprite)).all()
+            # the food list changes, only the new balls need new blit items
+            food_manager.remove_balls(balls[:100])
+            food_manager.add_balls(food_manager.spawn_balls_batch(50))
+        render.close()
@@ -1,4 +1,7 @@
+import math
 import random
+import itertools
+from operator import attrgetter
 from easydict import EasyDict
 import uuid
 import logging
@@ -6,6 +9,7 @@ import cv2
 import os
 import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 os.environ['SDL_AUDIODRIVER'] = 'dsp'
@@ -154,8 +158,10 @@ class Server:
         
         self.border = Border(0, 0, self.map_width, self.map_height)
         self.last_time = 0
-        self.screens_all = []
-        self.screens_partial = {}
+        self.screens_all = None # preallocated frames of the whole map, created when the first frame is saved
+        self.screens_partial = {} # player name -> preallocated frames of the player's view
+        self.screens_num = 0 # number of frames saved
+        self._resting_signature = None # balls after the last collision solve that changed nothing, if no player ball moved
 
         self.food_manager = FoodManager(self.cfg.manager_settings.food_manager, border=self.border)
         self.thorns_manager = ThornsManager(self.cfg.manager_settings.thorns_manager, border=self.border)
@@ -166,6 +172,15 @@ class Server:
 
         self.collision_detection_type = self.cfg.collision_detection_type
         self.collision_detection = create_collision_detection(self.collision_detection_type, border=self.border)
+        # (moving ball type, target ball type) -> handler, pairs that are not listed do not interact
+        self.collision_handlers = {
+            (CloneBall.TYPE_ID, CloneBall.TYPE_ID): self.deal_with_clone_and_clone,
+            (CloneBall.TYPE_ID, FoodBall.TYPE_ID): self.deal_with_clone_and_food,
+            (CloneBall.TYPE_ID, SporeBall.TYPE_ID): self.deal_with_clone_and_spore,
+            (CloneBall.TYPE_ID, ThornsBall.TYPE_ID): self.deal_with_clone_and_thorns,
+            (ThornsBall.TYPE_ID, CloneBall.TYPE_ID): self.deal_with_thorns_and_clone,
+            (ThornsBall.TYPE_ID, SporeBall.TYPE_ID): self.deal_with_thorns_and_spore,
+        }
 
     def spawn_balls(self):
         '''
@@ -176,8 +191,13 @@ class Server:
         self.player_manager.init_balls() # init player
 
     def step_state_tick(self, actions=None):
+        # Attributes used in the loops below are bound to locals once per tick
+        duration = self.state_tick_duration
+        player_manager = self.player_manager
+        thorns_manager = self.thorns_manager
+        spore_manager = self.spore_manager
+        players = player_manager.get_players()
         moving_balls = [] # Record all balls in motion
-        total_balls = [] # Record all balls
         # Update all player balls according to action
         if actions is not None:
             '''
@@ -186,106 +206,140 @@ class Server:
               If move and stop move occur at the same time in action, perform stop move operation
             '''
 
-            for player in self.player_manager.get_players():
+            for player in players:
                 direction_x, direction_y, action_type = actions[player.name]
                 if direction_x is None or direction_y is None:
                     direction = None
                 else:
-                    direction = Vector2(direction_x, direction_y).normalize()
+                    direction = Vector2(direction_x, direction_y)
+                    if direction.length_squared() > 0: # a zero direction adds no acceleration
+                        direction.normalize_ip()
                 if action_type == 0: # spore
                     tmp_spore_balls = player.eject()
                     for tmp_spore_ball in tmp_spore_balls:
                         if tmp_spore_ball:
-                            self.spore_manager.add_balls(tmp_spore_ball) 
+                            spore_manager.add_balls(tmp_spore_ball) 
                 if action_type == 1: # split
-                    self.player_manager.add_balls(player.split())
+                    player_manager.add_balls(player.split())
                 if action_type == 2: # stop moving
                     player.stop()
                 else: # move
-                    player.move(direction=direction, duration=self.state_tick_duration)
+                    player.move(direction=direction, duration=duration)
                     moving_balls.extend(player.get_balls())
         else:
-            for player in self.player_manager.get_players():
-                player.move(duration=self.state_tick_duration)
+            for player in players:
+                player.move(duration=duration)
                 moving_balls.extend(player.get_balls())
-                total_balls.extend(player.get_balls())
-        moving_balls = sorted(moving_balls, reverse=True) # Sort by size
+        moving_balls.sort(key=attrgetter('size'), reverse=True) # Sort by size
+        player_balls_num = len(moving_balls)
+        players_moving = player_balls_num > 0
         # Update the status of other balls after moving, and record the balls with status updates
-        for thorns_ball in self.thorns_manager.get_balls():
-            if thorns_ball.moving:
-                thorns_ball.move(duration=self.state_tick_duration)
-            moving_balls.append(thorns_ball)
-        for spore_ball in self.spore_manager.get_balls():
-            if spore_ball.moving:
-                spore_ball.move(duration=self.state_tick_duration)
+        # Only the thorns and spore balls that are still moving are tracked by their managers
+        thorns_manager.move_balls(duration)
+        spore_manager.move_balls(duration)
+        moving_balls.extend(thorns_manager.get_balls())
         # Adjust the position of all player balls
-        self.player_manager.adjust()
-        # Collision detection
-        total_balls.extend(self.player_manager.get_balls())
-        total_balls.extend(self.thorns_manager.get_balls())
-        total_balls.extend(self.spore_manager.get_balls())
-        total_balls.extend(self.food_manager.get_balls())
-        collisions_dict = self.collision_detection.solve(moving_balls, total_balls)
-        # Process each ball in moving_balls
-        for index, moving_ball in enumerate(moving_balls):
-            if not moving_ball.is_remove and index in collisions_dict:
-                for target_ball in collisions_dict[index]:
-                    self.deal_with_collision(moving_ball, target_ball)
+        player_manager.adjust()
+        # Collision detection. If no player ball moves, only the resting thorns balls are queried, and their collisions 
+        # only depend on where the balls are and how big they are. So when the last solve changed nothing, 
+        # and nothing has changed since, solving again would change nothing either
+        resting_signature = None if players_moving else self.get_resting_signature()
+        if moving_balls and (resting_signature is None or resting_signature != self._resting_signature):
+            # The collision detection only iterates over the gallery once, so chain the balls instead of copying them
+            total_balls = itertools.chain(player_manager.get_balls(), thorns_manager.get_balls(),
+                                          spore_manager.get_balls())
+            collision_detection = self.collision_detection
+            if not collision_detection.exact:
+                # The food balls must go through the configured detection to get the same collisions as before
+                total_balls = itertools.chain(total_balls, self.food_manager.get_balls())
+            collisions_dict = collision_detection.solve(moving_balls, total_balls)
+            if collision_detection.exact:
+                # Food balls are static and numerous, so the food manager solves their collisions with vectorized numpy. 
+                # Only player balls can eat food balls, and they come first in moving_balls
+                food_collisions_dict = self.food_manager.solve_collisions(moving_balls[:player_balls_num])
+                # Merge the food balls in where the collision detection would have listed them 
+                # if they were still at the end of its gallery
+                result_key = collision_detection.get_result_key()
+                for index, food_balls in food_collisions_dict.items():
+                    target_balls = collisions_dict.get(index, []) + food_balls
+                    if result_key is not None:
+                        target_balls.sort(key=result_key)
+                    collisions_dict[index] = target_balls
+            # Process each ball in moving_balls
+            deal_with_collision = self.deal_with_collision
+            for index, moving_ball in enumerate(moving_balls):
+                if not moving_ball.is_remove:
+                    for target_ball in collisions_dict.get(index, ()):
+                        deal_with_collision(moving_ball, target_ball)
+            if resting_signature is not None and self.get_resting_signature() == resting_signature:
+                self._resting_signature = resting_signature
+            else:
+                self._resting_signature = None
         # After each tick, check if there is a need to update food, thorns, and player rebirth
-        self.food_manager.step(duration=self.state_tick_duration)
-        self.spore_manager.step(duration=self.state_tick_duration)
-        self.thorns_manager.step(duration=self.state_tick_duration)
-        self.player_manager.step()
-        self.last_time += self.state_tick_duration
+        self.food_manager.step(duration=duration)
+        spore_manager.step(duration=duration)
+        thorns_manager.step(duration=duration)
+        player_manager.step()
+        self.last_time += duration
+
+    def get_resting_signature(self):
+        '''
+        Overview:
+            Get the names, positions and sizes of all balls that take part in collisions without moving player balls
+        '''
+        balls = itertools.chain(self.player_manager.get_balls(), self.thorns_manager.get_balls(), 
+                                self.spore_manager.get_balls())
+        return tuple((ball.name, ball.position.x, ball.position.y, ball.size) for ball in balls)
 
     def deal_with_collision(self, moving_ball, target_ball):
         if not moving_ball.is_remove and not target_ball.is_remove: # Ensure that the two balls are present
-            if isinstance(moving_ball, CloneBall): 
-                if isinstance(target_ball, CloneBall):
-                    if moving_ball.team_name != target_ball.team_name:
-                        if moving_ball.size > target_ball.size:
-                            moving_ball.eat(target_ball)
-                            self.player_manager.remove_balls(target_ball)
-                        else:
-                            target_ball.eat(moving_ball)
-                            self.player_manager.remove_balls(moving_ball)
-                    elif moving_ball.owner != target_ball.owner:
-                        if moving_ball.size > target_ball.size:
-                            if self.player_manager.get_clone_num(target_ball) > 1:
-                                moving_ball.eat(target_ball)
-                                self.player_manager.remove_balls(target_ball)
-                        else:
-                            if self.player_manager.get_clone_num(moving_ball) > 1:
-                                target_ball.eat(moving_ball)
-                                self.player_manager.remove_balls(moving_ball)
-                elif isinstance(target_ball, FoodBall):
-                    moving_ball.eat(target_ball)
-                    self.food_manager.remove_balls(target_ball)
-                elif isinstance(target_ball, SporeBall):
-                    moving_ball.eat(target_ball)
-                    self.spore_manager.remove_balls(target_ball)
-                elif isinstance(target_ball, ThornsBall):
-                    if moving_ball.size > target_ball.size:
-                        ret = moving_ball.eat(target_ball, clone_num=self.player_manager.get_clone_num(moving_ball))
-                        self.thorns_manager.remove_balls(target_ball)
-                        if isinstance(ret, list): 
-                            self.player_manager.add_balls(ret) 
-            elif isinstance(moving_ball, ThornsBall):
-                if isinstance(target_ball, CloneBall):
-                    if moving_ball.size < target_ball.size: 
-                        ret = target_ball.eat(moving_ball, clone_num=self.player_manager.get_clone_num(target_ball))
-                        self.thorns_manager.remove_balls(moving_ball)
-                        if isinstance(ret, list): 
-                            self.player_manager.add_balls(ret) 
-                elif isinstance(target_ball, SporeBall): 
+            handler = self.collision_handlers.get((moving_ball.TYPE_ID, target_ball.TYPE_ID))
+            if handler is not None:
+                handler(moving_ball, target_ball)
+
+    def deal_with_clone_and_clone(self, moving_ball, target_ball):
+        if moving_ball.team_name != target_ball.team_name:
+            if moving_ball.size > target_ball.size:
+                moving_ball.eat(target_ball)
+                self.player_manager.remove_balls(target_ball)
+            else:
+                target_ball.eat(moving_ball)
+                self.player_manager.remove_balls(moving_ball)
+        elif moving_ball.owner != target_ball.owner:
+            if moving_ball.size > target_ball.size:
+                if self.player_manager.get_clone_num(target_ball) > 1:
                     moving_ball.eat(target_ball)
-                    self.spore_manager.remove_balls(target_ball)
-            elif isinstance(moving_ball, ThornsBall):
-                if isinstance(target_ball, CloneBall) or isinstance(target_ball, ThornsBall): 
+                    self.player_manager.remove_balls(target_ball)
+            else:
+                if self.player_manager.get_clone_num(moving_ball) > 1:
                     target_ball.eat(moving_ball)
-                    self.spore_manager.remove_balls(moving_ball)
-        else:
-            return
+                    self.player_manager.remove_balls(moving_ball)
+
+    def deal_with_clone_and_food(self, moving_ball, target_ball):
+        moving_ball.eat(target_ball)
+        self.food_manager.remove_balls(target_ball)
+
+    def deal_with_clone_and_spore(self, moving_ball, target_ball):
+        moving_ball.eat(target_ball)
+        self.spore_manager.remove_balls(target_ball)
+
+    def deal_with_clone_and_thorns(self, moving_ball, target_ball):
+        if moving_ball.size > target_ball.size:
+            ret = moving_ball.eat(target_ball, clone_num=self.player_manager.get_clone_num(moving_ball))
+            self.thorns_manager.remove_balls(target_ball)
+            if isinstance(ret, list): 
+                self.player_manager.add_balls(ret) 
+
+    def deal_with_thorns_and_clone(self, moving_ball, target_ball):
+        if moving_ball.size < target_ball.size: 
+            ret = target_ball.eat(moving_ball, clone_num=self.player_manager.get_clone_num(target_ball))
+            self.thorns_manager.remove_balls(moving_ball)
+            if isinstance(ret, list): 
+                self.player_manager.add_balls(ret) 
+
+    def deal_with_thorns_and_spore(self, moving_ball, target_ball):
+        self.thorns_manager.eat_spore(moving_ball, target_ball)
+        self.spore_manager.remove_balls(target_ball)
 
     def start(self):
         self.spawn_balls()
@@ -296,8 +350,10 @@ class Server:
 
     def reset(self):
         self.last_time = 0
-        self.screens_all = []
-        self.screens_partial = {}
+        self.screens_all = None # preallocated frames of the whole map, created when the first frame is saved
+        self.screens_partial = {} # player name -> preallocated frames of the player's view
+        self.screens_num = 0 # number of frames saved
+        self._resting_signature = None # balls after the last collision solve that changed nothing, if no player ball moved
         self.food_manager.reset()
         self.thorns_manager.reset()
         self.spore_manager.reset()
@@ -320,15 +376,40 @@ class Server:
                             thorns_balls=self.thorns_manager.get_balls(),
                             spore_balls=self.spore_manager.get_balls(),
                             players=self.player_manager.get_players())
-                        self.screens_all.append(screen_data_all)
-                        for player_name, screen_data_player in screen_data_players.items():
-                            if player_name not in self.screens_partial:
-                                self.screens_partial[player_name] = []
-                            self.screens_partial[player_name].append(screen_data_player)
+                        self.save_frames(screen_data_all, screen_data_players)
                 else:
                     self.step_state_tick()
         return False
 
+    def save_frames(self, screen_data_all, screen_data_players):
+        '''
+        Overview:
+            Copy the frames of the current action tick into the video buffers, which are allocated once for the whole match
+        '''
+        if self.screens_all is None:
+            # Each step advances the match by state_tick_per_action_tick state ticks and saves one frame. 
+            # last_time is accumulated in floats, so leave room for one frame more than the exact number
+            action_tick_duration = self.state_tick_per_action_tick * self.state_tick_duration
+            frame_num = int(math.ceil(self.match_time / action_tick_duration)) + 1
+            self.screens_all = np.empty((frame_num,) + screen_data_all.shape, dtype=np.uint8)
+        elif self.screens_num == len(self.screens_all):
+            # More frames than the match needs, e.g. match_time was changed, so double the buffers
+            self.screens_all = self.grow_frames(self.screens_all)
+            self.screens_partial = {player_name: self.grow_frames(screens) 
+                                    for player_name, screens in self.screens_partial.items()}
+        self.screens_all[self.screens_num] = screen_data_all
+        for player_name, screen_data_player in screen_data_players.items():
+            if player_name not in self.screens_partial:
+                self.screens_partial[player_name] = np.empty((len(self.screens_all),) + screen_data_player.shape, dtype=np.uint8)
+            self.screens_partial[player_name][self.screens_num] = screen_data_player
+        self.screens_num += 1
+
+    @staticmethod
+    def grow_frames(screens):
+        new_screens = np.empty((2 * len(screens),) + screens.shape[1:], dtype=screens.dtype)
+        new_screens[:len(screens)] = screens
+        return new_screens
+
     def set_render(self, render):
         self.render = render
 
@@ -354,20 +435,26 @@ class Server:
         video_id = time.strftime("%Y-%m-%d-%H-%M-%S", time.localtime())
         fps = self.action_tick_per_second
         # save all
-        video_file = os.path.join(save_path, '{}-all.mp4'.format(video_id))
-        out = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*'MP4V'), fps, self.screens_all[0].shape[:2])
-        for screen in self.screens_all:
-            out.write(screen)
-        out.release()
-        cv2.destroyAllWindows()
+        videos = [(os.path.join(save_path, '{}-all.mp4'.format(video_id)), self.screens_all[:self.screens_num], 
+                   self.screens_all.shape[1:3])]
         # save partial
         for player_name, screens in self.screens_partial.items():
             video_file = os.path.join(save_path, '{}-{:02d}.mp4'.format(video_id, int(player_name)))
-            out = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*'MP4V'), fps, (300,300))
-            for screen in screens:
-                out.write(screen)
-            out.release()
-            cv2.destroyAllWindows()
+            videos.append((video_file, screens[:self.screens_num], (300,300)))
+        # OpenCV releases the GIL while encoding, so the videos are written concurrently
+        with ThreadPoolExecutor(max_workers=min(len(videos), os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(self.write_video, video_file, screens, frame_size, fps) 
+                       for video_file, screens, frame_size in videos]
+            for future in futures:
+                future.result()
+        cv2.destroyAllWindows()
+
+    @staticmethod
+    def write_video(video_file, screens, frame_size, fps):
+        out = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*'MP4V'), fps, frame_size)
+        for screen in screens:
+            out.write(screen)
+        out.release()
 
     def get_player_names(self):
         return self.player_manager.get_player_names()
@@ -30,6 +30,97 @@ class TestServer:
         render.show()
         render.close()
 
+    def test_deal_with_collision(self):
+        server = Server()
+        server.start()
+        clone_ball = server.player_manager.get_balls()[0]
+        food_ball = server.food_manager.get_balls()[0]
+        food_num = len(server.food_manager.get_balls())
+        server.deal_with_collision(food_ball, clone_ball) # food can not eat anything
+        assert not food_ball.is_remove
+        clone_size = clone_ball.size
+        server.deal_with_collision(clone_ball, food_ball)
+        assert food_ball.is_remove
+        assert clone_ball.size > clone_size
+        assert len(server.food_manager.get_balls()) == food_num - 1
+
+    def test_step_zero_direction(self):
+        server = Server()
+        server.start()
+        actions = {player_name: [0, 0, -1] for player_name in server.get_player_names()}
+        for i in range(3):
+            server.step_state_tick(actions=actions) # a zero direction adds no acceleration instead of raising
+
+    @pytest.mark.parametrize('cd_type, food_in_gallery', [
+        ('exhaustive', False), ('precision', False), ('rebuild_quadtree', True), ('remove_quadtree', True)])
+    def test_food_collisions(self, cd_type, food_in_gallery):
+        server = Server(dict(collision_detection_type=cd_type))
+        server.start()
+        solve = server.collision_detection.solve
+        galleries = []
+        def record_solve(query_list, gallery_list):
+            gallery_list = list(gallery_list)
+            galleries.append(gallery_list)
+            return solve(query_list, gallery_list)
+        server.collision_detection.solve = record_solve
+        clone_ball = server.player_manager.get_balls()[0]
+        food_ball = server.food_manager.get_balls()[0]
+        clone_ball.position = Vector2(food_ball.position)
+        actions = {player_name: [1, 0, -1] for player_name in server.get_player_names()}
+        server.step_state_tick(actions=actions)
+        # the quadtree detections may miss covers, so they keep solving the food balls themselves
+        assert (food_ball in galleries[0]) == food_in_gallery
+        if not food_in_gallery:
+            assert food_ball.is_remove
+
+    def test_step_without_moving_balls(self):
+        server = Server()
+        server.start()
+        solve = server.collision_detection.solve
+        solve_num = [0]
+        def count_solve(query_list, gallery_list):
+            solve_num[0] += 1
+            return solve(query_list, gallery_list)
+        server.collision_detection.solve = count_solve
+        actions = {player_name: [0, 0, 2] for player_name in server.get_player_names()}
+        for i in range(3):
+            server.step_state_tick(actions=actions)
+        # every player stopped, so once a solve changes nothing the resting thorns balls are not queried again
+        solve_num[0] = 0
+        server.step_state_tick(actions=actions)
+        assert solve_num[0] == 0
+        # a new thorns ball may collide with the resting balls
+        server.thorns_manager.add_balls(server.thorns_manager.spawn_ball())
+        server.step_state_tick(actions=actions)
+        assert solve_num[0] == 1
+        # a moving player always queries
+        actions = {player_name: [1, 0, -1] for player_name in server.get_player_names()}
+        server.step_state_tick(actions=actions)
+        server.step_state_tick(actions=actions)
+        assert solve_num[0] == 3
+
+    def test_save_frames(self):
+        # 20 state ticks per second do not divide into 3 action ticks, so each step lasts 0.3 seconds
+        server = Server(dict(match_time=3, action_tick_per_second=3, team_num=2, player_num_per_team=1))
+        server.set_render(EnvRender(server.map_width, server.map_height))
+        server.start()
+        step_num = 0
+        while server.last_time < server.match_time:
+            actions = {player_name: [random.uniform(-1, 1), random.uniform(-1, 1), -1] \
+                        for player_name in server.get_player_names()}
+            server.step(actions, save_video=True)
+            step_num += 1
+        assert server.screens_num == step_num
+        assert len(server.screens_all) >= step_num
+        for screens in server.screens_partial.values():
+            assert len(screens) == len(server.screens_all)
+        server.match_time += 1 # more frames than the buffers were sized for
+        for i in range(3):
+            assert not server.step(actions, save_video=True)
+        assert server.screens_num == step_num + 3
+        for screens in server.screens_partial.values():
+            assert len(screens) == len(server.screens_all)
+
     def test_step_control_random(self):
         server = Server()
         server.start()
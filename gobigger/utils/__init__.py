@@ -1,5 +1,7 @@
+import numpy as np
+
 from .structures import format_vector, add_size, save_screen_data_to_img, Border, QuadNode
-from .collision_detection import create_collision_detection
+from .collision_detection import create_collision_detection, solve_cover
 from .precision_algorithm import precision_algorithm 
 
 from .tool import *
@@ -35,6 +37,8 @@ Colors = [
         (106,90,205)
 ]
 
+Colors_np = np.array(Colors, dtype=np.uint8) # Colors as an array, so that the colors of many players can be fetched at once
+
 GRAY = (220, 220, 220)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
@@ -66,6 +70,8 @@ PLAYER_COLORS = [
         (252,252,252),
 ]
 
+PLAYER_COLORS_np = np.array(PLAYER_COLORS, dtype=np.uint8)
+
 FOOD_COLOR = (0,0,0)
 THORNS_COLOR = (100,100,100)
 SPORE_COLOR = (200,200,200)
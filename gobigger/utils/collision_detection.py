@@ -1,17 +1,29 @@
 import numpy as np
 import logging
+from typing import Iterable
 
 from .structures import Border, QuadNode
 
 
 class BaseCollisionDetection:
 
+    exact = True # solve finds every ball the query covers, so part of the gallery may be solved elsewhere
+
     def __init__(self, border: Border) -> None:
         self.border = border
 
-    def solve(self, query_list: list, gallery_list: list):
+    def solve(self, query_list: list, gallery_list: Iterable):
         raise NotImplementedError
 
+    def get_result_key(self):
+        '''
+        Overview:
+            Get the sort key that gives the order in which solve lists the collisions of each query, 
+            so that collisions found elsewhere can be merged in as if they came at the end of the gallery. 
+            None means they are simply appended
+        '''
+        return None
+
 
 class ExhaustiveCollisionDetection(BaseCollisionDetection):
     '''
@@ -21,13 +33,13 @@ class ExhaustiveCollisionDetection(BaseCollisionDetection):
     def __init__(self, border: Border) -> None:
         super(ExhaustiveCollisionDetection, self).__init__(border=border)
 
-    def solve(self, query_list: list, gallery_list: list):
+    def solve(self, query_list: list, gallery_list: Iterable):
         '''
         Overview:
             For the balls in the query, enumerate each ball in the gallery to determine whether there is a collision
         Parameters:
             query_list <List[BaseBall]>: List of balls that need to be queried for collision
-            gallery_list <List[BaseBall]>: List of all balls
+            gallery_list <Iterable[BaseBall]>: All balls, copied into a list as it is scanned once per query
         Returns:
             results <Dict[int: List[BaseBall]> return value
                 int value denotes:
@@ -35,6 +47,7 @@ class ExhaustiveCollisionDetection(BaseCollisionDetection):
                 string value denotes:
                     List of balls that collided with the query corresponding to the subscript
         '''
+        gallery_list = list(gallery_list) # the gallery is scanned once per query, so it must not be a one-shot iterator
         results = {}
         for i, q in enumerate(query_list):
             results[i] = []
@@ -75,6 +88,10 @@ class PrecisionCollisionDetection(BaseCollisionDetection) :
         return row_id
 
 
+    def get_result_key(self):
+        # Rows are scanned in order and the balls in each row are sorted by the ordinate
+        return lambda ball: (self.get_row(ball.position.x), ball.position.y)
+
     def dichotomous_jump(self, value, row_id) -> int:
         '''
         Overview:
@@ -95,13 +112,13 @@ class PrecisionCollisionDetection(BaseCollisionDetection) :
                 l = mid + 1
         return pos
 
-    def solve(self, query_list: list, gallery_list: list):
+    def solve(self, query_list: list, gallery_list: Iterable):
         '''
         Overview:
             First, you need to sort the balls in each row according to the ordinate. For the balls in query_list, first abstract the boundary of the ball into a rectangle, then traverse each row in the rectangle, and find the first ball covered by the query through dichotomy in each row, and then Enumerate the balls in sequence until the ordinate exceeds the boundary of the query rectangle
         Parameters:
             query_list <List[BaseBall]>: List of balls that need to be queried for collision
-            gallery_list <List[BaseBall]>: List of all balls
+            gallery_list <Iterable[BaseBall]>: All balls, iterated only once
         Returns:
             results <Dict[int: List[BaseBall]> return value
                 int value denotes:
@@ -140,6 +157,8 @@ class RebuildQuadTreeCollisionDetection(BaseCollisionDetection) :
             Build a quadtree on a two-dimensional plane in every frame, and query collisions in the quadtree
 
     '''
+    exact = False # the quadtree may miss balls that the query covers, so every ball goes through solve
+
     def __init__(self, border: Border, node_capacity = 64, tree_depth = 32) -> None:
         '''
         Parameter:
@@ -151,13 +170,13 @@ class RebuildQuadTreeCollisionDetection(BaseCollisionDetection) :
         self.tree_depth = tree_depth
         self.border = border
     
-    def solve(self, query_list: list, gallery_list: list):
+    def solve(self, query_list: list, gallery_list: Iterable):
         '''
         Overview:
            Construct a quadtree from scratch based on gallery_list and complete the query
         Parameters:
             query_list <List[BaseBall]>: List of balls that need to be queried for collision
-            gallery_list <List[BaseBall]>: List of all balls
+            gallery_list <Iterable[BaseBall]>: All balls, iterated only once
         Returns:
             results <Dict[int: List[BaseBall]> return value
                 int value denotes:
@@ -187,6 +206,8 @@ class RemoveQuadTreeCollisionDetection(BaseCollisionDetection) :
             Add delete operations for the quadtree, and dynamically maintain a quadtree
 
     '''
+    exact = False # the quadtree may miss balls that the query covers, so every ball goes through solve
+
     def __init__(self, border: Border, node_capacity = 64, tree_depth = 32) -> None:
         '''
         Parameter:
@@ -199,13 +220,13 @@ class RemoveQuadTreeCollisionDetection(BaseCollisionDetection) :
         self.border = border
         self.quadTree = QuadNode(border = border, max_depth = tree_depth, max_num = node_capacity, parent=None)
     
-    def solve(self, query_list: list, changed_node_list: list):
+    def solve(self, query_list: list, changed_node_list: Iterable):
         '''
         Overview:
            Update the points in the quadtree according to the changed_node_list and complete the query
         Parameters:
             query_list <List[BaseBall]>: List of balls that need to be queried for collision
-            gallery_list <List[BaseBall]>: List of all balls
+            changed_node_list <Iterable[BaseBall]>: Balls that changed since the last call, iterated only once
         Returns:
             results <Dict[int: List[BaseBall]> return value
                 int value denotes:
@@ -228,6 +249,25 @@ class RemoveQuadTreeCollisionDetection(BaseCollisionDetection) :
                     results[i].append(result)
         return results
 
+def solve_cover(query, gallery):
+    '''
+    Overview:
+        Vectorized version of BaseBall.judge_cover between every query circle and every gallery circle
+    Parameters:
+        query <np.ndarray>: shape (N, 3), x, y and radius of each query circle
+        gallery <np.ndarray>: shape (M, 3), x, y and radius of each gallery circle
+    Returns:
+        results <List[np.ndarray]>: for each query circle, the indices of the gallery circles covered by it
+    '''
+    query = query.reshape(-1, 3)
+    gallery = gallery.reshape(-1, 3)
+    dx = query[:, 0:1] - gallery[:, 0]
+    dy = query[:, 1:2] - gallery[:, 1]
+    radius = np.maximum(query[:, 2:3], gallery[:, 2])
+    rows, cols = np.nonzero(dx * dx + dy * dy < radius * radius)
+    return np.split(cols, np.searchsorted(rows, np.arange(1, len(query))))
+
+
 def create_collision_detection(cd_type, **cd_kwargs):
     if cd_type == 'exhaustive':
         return ExhaustiveCollisionDetection(**cd_kwargs)
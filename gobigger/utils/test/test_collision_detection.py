@@ -10,7 +10,7 @@ import numpy as np
 import cv2
 import time
 
-from gobigger.utils import Border, create_collision_detection
+from gobigger.utils import Border, create_collision_detection, solve_cover
 from gobigger.balls import BaseBall
 
 logging.basicConfig(level=logging.DEBUG)
@@ -84,6 +84,62 @@ class TestCollisionDection:
         query_list = random.sample(gallery_list, query_num)
         collision_detection.solve(query_list, change_list)
         assert True
+
+    def test_iterable_gallery(self):
+        border = Border(0, 0, 1000, 1000)
+        gallery_list = []
+        for i in range(1000):
+            x = random.randint(border.minx, border.maxx) + random.random()
+            y = random.randint(border.miny, border.maxy) + random.random()
+            gallery_list.append(BaseBall(i, position=Vector2(x, y), border=border, size=random.uniform(5, 30)**2))
+        query_list = random.sample(gallery_list, 200)
+        for collision_type in ['exhaustive', 'precision', 'rebuild_quadtree']:
+            collision_detection = create_collision_detection(collision_type, border=border)
+            results = collision_detection.solve(query_list, gallery_list)
+            assert collision_detection.solve(query_list, iter(gallery_list)) == results
+
+    def test_get_result_key(self):
+        border = Border(0, 0, 1000, 1000)
+        gallery_list = []
+        for i in range(1000):
+            x = random.randint(border.minx, border.maxx) + random.random()
+            y = random.randint(border.miny, border.maxy) + random.random()
+            gallery_list.append(BaseBall(i, position=Vector2(x, y), border=border, size=random.uniform(5, 30)**2))
+        query_list = random.sample(gallery_list, 200)
+        head_list, tail_list = gallery_list[:700], gallery_list[700:]
+        for collision_type in ['exhaustive', 'precision']:
+            collision_detection = create_collision_detection(collision_type, border=border)
+            results = collision_detection.solve(query_list, gallery_list)
+            head_results = collision_detection.solve(query_list, head_list)
+            tail_results = collision_detection.solve(query_list, tail_list)
+            result_key = collision_detection.get_result_key()
+            for i in range(len(query_list)):
+                merged = head_results[i] + tail_results[i]
+                if result_key is not None:
+                    merged.sort(key=result_key)
+                assert merged == results[i]
+
+    def test_solve_cover(self):
+        border = Border(0, 0, 1000, 1000)
+        totol_num = 1000
+        query_num = 200
+        gallery_list = []
+        for i in range(totol_num):
+            x = random.randint(border.minx, border.maxx) + random.random()
+            y = random.randint(border.miny, border.maxy) + random.random()
+            gallery_list.append(BaseBall(i, position=Vector2(x, y), border=border, size=random.uniform(5, 10)**2))
+        query_list = []
+        for i in range(query_num):
+            x = random.randint(border.minx, border.maxx) + random.random()
+            y = random.randint(border.miny, border.maxy) + random.random()
+            query_list.append(BaseBall(totol_num + i, position=Vector2(x, y), border=border, size=random.uniform(5, 10)**2))
+        query = np.array([(ball.position.x, ball.position.y, ball.radius) for ball in query_list])
+        gallery = np.array([(ball.position.x, ball.position.y, ball.radius) for ball in gallery_list])
+        results = solve_cover(query, gallery)
+        assert len(results) == query_num
+        collision_detection = create_collision_detection("exhaustive", border=border)
+        for i, balls in collision_detection.solve(query_list, gallery_list).items():
+            assert [gallery_list[j] for j in results[i]] == balls
         
 
 class SpeedTest: